@@ -1,40 +1,48 @@
 """
 Quick script to check actual date range in Salt repo
 """
-from git import Repo
+import subprocess
 from datetime import datetime
 
 repo_path = "data/raw/salt"
-repo = Repo(repo_path)
+
+
+def git(*args):
+    """Run a git command in the repo and return its stripped stdout"""
+    return subprocess.run(
+        ["git", "-C", repo_path, *args],
+        capture_output=True, text=True, errors="replace", check=True
+    ).stdout.strip()
+
 
 print("Checking Salt repository dates...\n")
 
-# Get oldest commit
+# Get oldest commit (the oldest root commit)
 print("Finding oldest commit...")
-oldest_commits = list(repo.iter_commits(max_count=1, reverse=True))
-if oldest_commits:
-    oldest = oldest_commits[0]
-    oldest_date = datetime.fromtimestamp(oldest.committed_date)
+roots = git("rev-list", "--max-parents=0", "HEAD").split()
+if roots:
+    oldest_ts, oldest_sha, oldest_subject = git("log", "-1", "--format=%ct%x1f%H%x1f%s", roots[-1]).split("\x1f", 2)
+    oldest_date = datetime.fromtimestamp(int(oldest_ts))
     print(f"✅ Oldest commit: {oldest_date.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"   SHA: {oldest.hexsha[:8]}")
-    print(f"   Message: {oldest.message.split(chr(10))[0][:60]}...")
+    print(f"   SHA: {oldest_sha[:8]}")
+    print(f"   Message: {oldest_subject[:60]}...")
 
 # Get newest commit
 print("\nFinding newest commit...")
-newest = list(repo.iter_commits(max_count=1))[0]
-newest_date = datetime.fromtimestamp(newest.committed_date)
+newest_ts, newest_sha, newest_subject = git("log", "-1", "--format=%ct%x1f%H%x1f%s").split("\x1f", 2)
+newest_date = datetime.fromtimestamp(int(newest_ts))
 print(f"✅ Newest commit: {newest_date.strftime('%Y-%m-%d %H:%M:%S')}")
-print(f"   SHA: {newest.hexsha[:8]}")
-print(f"   Message: {newest.message.split(chr(10))[0][:60]}...")
+print(f"   SHA: {newest_sha[:8]}")
+print(f"   Message: {newest_subject[:60]}...")
 
-# Count total commits
-print("\nCounting all commits (this may take a minute)...")
-total = sum(1 for _ in repo.iter_commits())
+# Count total commits (counted inside git)
+print("\nCounting all commits...")
+total = int(git("rev-list", "--count", "HEAD"))
 print(f"✅ Total commits: {total:,}")
 
 # Check commits since 2020
 print("\nCounting commits since 2020-01-01...")
-since_2020 = sum(1 for _ in repo.iter_commits(since=datetime(2020, 1, 1)))
+since_2020 = int(git("rev-list", "--count", "--since=2020-01-01 00:00:00", "HEAD"))
 print(f"✅ Commits since 2020: {since_2020:,}")
 
 print("\n" + "="*60)
@@ -60,5 +60,14 @@ CREATE TABLE IF NOT EXISTS predictions (
   created_at TEXT DEFAULT (datetime('now'))
 );
 
+-- Conditional-request validators for paged GitHub API reads
+CREATE TABLE IF NOT EXISTS http_cache (
+  url TEXT PRIMARY KEY,
+  etag TEXT,
+  next_url TEXT,
+  item_count INTEGER,
+  last_seen TEXT DEFAULT (datetime('now'))
+);
+
 CREATE INDEX IF NOT EXISTS idx_issues_repo_time ON issues(repo_full_name, created_at);
 CREATE INDEX IF NOT EXISTS idx_commits_repo_time ON commits(repo_full_name, timestamp);
@@ -1,8 +1,12 @@
 # etl/historic_backfill.py
 
 import os, json, re, time, sqlite3, yaml
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 import yaml
 from dotenv import load_dotenv
 
@@ -11,9 +15,16 @@ load_dotenv()
 DB_PATH = "data/dev.sqlite3"
 SETTINGS = "config/settings.yaml"
 SCHEMA = "config/schema.sql"
+SCHEMA_VERSION = 1      # bump whenever config/schema.sql changes
 
 GITHUB_API = "https://api.github.com"
+GRAPHQL_API = f"{GITHUB_API}/graphql"
+BATCH_SIZE = 500        # rows per executemany/commit
+DETAIL_WORKERS = 16     # concurrent commit detail calls
+DETAIL_RETRIES = 5      # attempts per detail call on 429 / 5xx / rate limit
 SESSION = requests.Session()
+# keep one warm keep-alive connection per worker instead of urllib3's default 10
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=DETAIL_WORKERS))
 TOKEN = os.getenv("GITHUB_TOKEN")
 
 if TOKEN:
@@ -27,33 +38,32 @@ def load_settings() -> dict:
 def init_db():
     os.makedirs("data", exist_ok=True)
     conn = sqlite3.connect(DB_PATH)
-    with open(SCHEMA, "r", encoding="utf-8") as f:
-        conn.executescript(f.read())
+    # only (re)apply the schema when the file's recorded version is behind
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        with open(SCHEMA, "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.close()
 
-def insert_issue(conn, repo: str, issue: dict, mapped_sev: Optional[str]):
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT OR REPLACE INTO issues
-        (id, repo_full_name, number, title, body, labels_json, mapped_severity, state, created_at, closed_at)
-        VALUES(?,?,?,?,?,?,?,?,?,?)
-    """, (
+def connect_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH)
+    # one writer, bulk loads: WAL + relaxed fsync, temp data and a larger page cache in memory
+    for pragma in ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY", "cache_size=-200000"):
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+def issue_row(repo: str, issue: dict, mapped_sev: Optional[str]) -> tuple:
+    return (
         issue["id"], repo, issue["number"], issue.get("title"),
         issue.get("body"), json.dumps(issue.get("labels", [])),
         mapped_sev, issue.get("state"),
         issue.get("created_at"), issue.get("closed_at")
-    ))
-    conn.commit()
+    )
 
-def insert_commit(conn, repo: str, commit: dict):
-    cur = conn.cursor()
+def commit_row(repo: str, commit: dict) -> tuple:
     stats = commit.get("stats") or {}
     files = commit.get("files") or []
-    cur.execute("""
-        INSERT OR REPLACE INTO commits
-        (sha, repo_full_name, author, timestamp, message, files_changed, insertions, deletions, pr_number)
-        VALUES (?,?,?,?,?,?,?,?,?)
-    """, (
+    return (
         commit["sha"],                               # sha
         repo,                                       # repo_full_name
         ((commit.get("author") or {}).get("login")  # author login if available
@@ -64,8 +74,39 @@ def insert_commit(conn, repo: str, commit: dict):
         stats.get("additions"),                                          # insertions
         stats.get("deletions"),                                          # deletions
         None                                                             # pr_number (fill later if needed)
-    ))
-    conn.commit()
+    )
+
+def graphql_commit_row(repo: str, node: dict) -> tuple:
+    author = node.get("author") or {}
+    date = author.get("date")
+    if date:
+        # GraphQL dates carry the author's offset; store UTC like the REST API does
+        date = datetime.fromisoformat(date.replace("Z", "+00:00")).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return (
+        node["oid"],                                                # sha
+        repo,                                                       # repo_full_name
+        (author.get("user") or {}).get("login") or author.get("name"),  # author login if available
+        date,                                                       # timestamp
+        node.get("message"),                                        # message
+        node.get("changedFilesIfAvailable"),                        # files_changed
+        node.get("additions"),                                      # insertions
+        node.get("deletions"),                                      # deletions
+        None                                                        # pr_number (fill later if needed)
+    )
+
+def insert_issues(conn, rows: List[tuple]):
+    conn.executemany("""
+        INSERT OR REPLACE INTO issues
+        (id, repo_full_name, number, title, body, labels_json, mapped_severity, state, created_at, closed_at)
+        VALUES(?,?,?,?,?,?,?,?,?,?)
+    """, rows)
+
+def insert_commits(conn, rows: List[tuple]):
+    conn.executemany("""
+        INSERT OR REPLACE INTO commits
+        (sha, repo_full_name, author, timestamp, message, files_changed, insertions, deletions, pr_number)
+        VALUES (?,?,?,?,?,?,?,?,?)
+    """, rows)
 
 
 def map_severity_from_labels(labels: List[dict], mapping: Dict[str, str]) -> Optional[str]:
@@ -76,20 +117,51 @@ def map_severity_from_labels(labels: List[dict], mapping: Dict[str, str]) -> Opt
             return mapping[name]
     return None
 
-def rate_limit_sleep(resp: requests.Response):
+def sleep_until_reset(resp: requests.Response):
+    reset = resp.headers.get("X-RateLimit-Reset")
+    wait = max(5, int(reset) - int(time.time())) if reset else 60
+    print(f"Rate limited. Sleeping {wait}s...")
+    time.sleep(wait)
+
+def rate_limit_sleep(resp: requests.Response) -> bool:
+    """Sleep out a rate-limit 403; False for any other 403 (bad scope, SAML), which callers raise."""
     if resp.status_code == 403 and 'rate limit' in resp.text.lower():
-        reset = resp.headers.get("X-RateLimit-Reset")
-        wait = max(5, int(reset) - int(time.time())) if reset else 60
-        print(f"Rate limited. Sleeping {wait}s...")
-        time.sleep(wait)
+        sleep_until_reset(resp)
+        return True
+    return False
+
+class PageCache:
+    """ETag + next link per page URL, so unchanged pages come back as (free) 304s."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get(self, url: str) -> Optional[Tuple[str, Optional[str], int]]:
+        return self.conn.execute(
+            "SELECT etag, next_url, item_count FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+
+    def put(self, url: str, etag: str, next_url: Optional[str], item_count: int):
+        self.conn.execute("""
+            INSERT OR REPLACE INTO http_cache (url, etag, next_url, item_count, last_seen)
+            VALUES (?,?,?,?,datetime('now'))
+        """, (url, etag, next_url, item_count))
 
-def paged(url: str, params: dict, limit: int):
-    """Generic pagination helper (simple)."""
+def paged(url: str, params: dict, limit: int, cache: Optional[PageCache] = None):
+    """Generic pagination helper (simple). With a cache, unchanged pages are skipped."""
     pulled = 0
+    if params:
+        url = requests.Request("GET", url, params=params).prepare().url
     while url and pulled < limit:
-        r = SESSION.get(url, params=params)
-        if r.status_code == 403:
-            rate_limit_sleep(r); continue
+        cached = cache.get(url) if cache else None
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        r = SESSION.get(url, headers=headers)
+        if r.status_code == 403 and rate_limit_sleep(r):
+            continue
+        if r.status_code == 304:
+            # unchanged since the last run; its rows are already stored
+            _, url, count = cached
+            pulled += count
+            continue
         r.raise_for_status()
         items = r.json()
         if isinstance(items, dict):
@@ -108,32 +180,128 @@ def paged(url: str, params: dict, limit: int):
                 if 'rel="next"' in part:
                     nxt = part[part.find('<')+1:part.find('>')]
                     break
+        # only remember fully consumed pages
+        if cache and r.headers.get("ETag"):
+            cache.put(url, r.headers["ETag"], nxt, len(items))
         url = nxt
-        params = {}     # only for first page
 
-def fetch_issues(repo: str, limit: int) -> List[dict]:
+def fetch_issues(repo: str, limit: int, cache: Optional[PageCache] = None) -> Iterator[dict]:
     url = f"{GITHUB_API}/repos/{repo}/issues"
     # include both open and closed; issues + PRs will appear-filter PRs out later
     params = {"state": "all", "per_page": 100}
-    return list(paged(url, params, limit))
+    return paged(url, params, limit, cache)
+
+def fetch_commit_detail(repo: str, sha: str) -> Optional[dict]:
+    """Fetch one commit with stats/files (one extra call per commit); None, logged, if it keeps failing."""
+    detail_url = f"{GITHUB_API}/repos/{repo}/commits/{sha}"
+    for attempt in range(DETAIL_RETRIES):
+        r = SESSION.get(detail_url)
+        if r.ok:
+            return r.json()
+        if attempt == DETAIL_RETRIES - 1:
+            break
+        if r.status_code == 429 or r.status_code >= 500:
+            # secondary rate limit or a server hiccup: honour Retry-After, else back off
+            retry_after = r.headers.get("Retry-After", "")
+            time.sleep(int(retry_after) if retry_after.isdigit() else 2 ** attempt)
+        elif not (r.status_code == 403 and rate_limit_sleep(r)):
+            break
+    print(f"Skipping commit {repo}@{sha}: HTTP {r.status_code}")
+    return None
 
-def fetch_commits(repo: str, limit: int) -> List[dict]:
+def fetch_commits(repo: str, limit: int) -> Iterator[dict]:
     url = f"{GITHUB_API}/repos/{repo}/commits"
     params = {"per_page": 100}
-    commits = []
-    for item in paged(url, params, limit):
-        # enrich each commmit with stats/files (one extra call)
-        sha = item.get("sha")
-        if not sha:
+    listing = paged(url, params, limit)
+    # detail calls are latency bound, so overlap them instead of sleeping between each;
+    # work one listing page at a time so details stream out as pages arrive
+    with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as pool:
+        while True:
+            shas = [item["sha"] for item in islice(listing, params["per_page"]) if item.get("sha")]
+            if not shas:
+                return
+            for detail in pool.map(lambda sha: fetch_commit_detail(repo, sha), shas):
+                if detail:
+                    yield detail
+
+COMMIT_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, after: $cursor) {
+            pageInfo { endCursor hasNextPage }
+            nodes {
+              oid message additions deletions changedFilesIfAvailable
+              author { name date user { login } }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+def graphql(query: str, variables: dict) -> dict:
+    while True:
+        r = SESSION.post(GRAPHQL_API, json={"query": query, "variables": variables})
+        if r.status_code == 403 and rate_limit_sleep(r):
             continue
-        detail_url = f"{GITHUB_API}/repos/{repo}/commits/{sha}"
-        r = SESSION.get(detail_url)
-        if r.status_code == 403:
-            rate_limit_sleep(r); r = SESSION.get(detail_url)
-        if r.ok:
-            commits.append(r.json())
-        time.sleep(0.1)     # to not overload the api
-    return commits
+        r.raise_for_status()
+        body = r.json()
+        # the primary GraphQL limit comes back as a 200 with a RATE_LIMITED error
+        if any(err.get("type") == "RATE_LIMITED" for err in body.get("errors") or []):
+            sleep_until_reset(r); continue
+        if body.get("errors"):
+            raise RuntimeError(f"GraphQL error: {body['errors']}")
+        return body["data"]
+
+def fetch_commits_graphql(repo: str, limit: int) -> Iterator[dict]:
+    """Commits with stats, 100 per request (GraphQL needs a token)."""
+    owner, name = repo.split("/", 1)
+    cursor, pulled = None, 0
+    while pulled < limit:
+        data = graphql(COMMIT_HISTORY_QUERY, {
+            "owner": owner, "name": name,
+            "first": min(100, limit - pulled), "cursor": cursor
+        })
+        history = data["repository"]["defaultBranchRef"]["target"]["history"]
+        for node in history["nodes"]:
+            yield node
+            pulled += 1
+        if not history["pageInfo"]["hasNextPage"]:
+            return
+        cursor = history["pageInfo"]["endCursor"]
+
+def flush(conn, insert, rows: List[tuple]):
+    if rows:
+        insert(conn, rows)
+        rows.clear()
+
+def ingest_repo(conn, repo: str, label_map: Dict[str, str], issue_limit: int, commit_limit: int):
+    # 1) Issues (with labels) -> map severity
+    rows = []
+    for iss in fetch_issues(repo, issue_limit, PageCache(conn)):
+        if "pull_request" in iss:
+            continue        # skipping PRs here; only taking issues
+        sev = map_severity_from_labels(iss.get("labels", []), label_map)
+        rows.append(issue_row(repo, iss, sev))
+        if len(rows) >= BATCH_SIZE:
+            flush(conn, insert_issues, rows)
+    flush(conn, insert_issues, rows)
+    
+    # 2) Commits (basic); GraphQL returns stats inline, REST needs a detail call per commit
+    if TOKEN:
+        commit_rows = (graphql_commit_row(repo, node) for node in fetch_commits_graphql(repo, commit_limit))
+    else:
+        commit_rows = (commit_row(repo, cm) for cm in fetch_commits(repo, commit_limit))
+    for row in commit_rows:
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            flush(conn, insert_commits, rows)
+    flush(conn, insert_commits, rows)
 
 def main():
     init_db()
@@ -143,22 +311,11 @@ def main():
     issue_limit = int(limits.get("issues", 1000))
     commit_limit = int(limits.get("commits", 1000))
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db()
     for repo in cfg.get("repos", []):
         print(f"== Repo: {repo} ==")
-
-        # 1) Issues (with labels) -> map severity
-        raw_issues = fetch_issues(repo, issue_limit)
-        for iss in raw_issues:
-            if "pull_request" in iss:
-                continue        # skipping PRs here; only taking issues
-            sev = map_severity_from_labels(iss.get("labels", []), label_map)
-            insert_issue(conn, repo, iss, sev)
-        
-        # 2) Commits (basic)
-        raw_commits = fetch_commits(repo, commit_limit)
-        for cm in raw_commits:
-            insert_commit(conn, repo, cm)
+        with conn:      # one transaction per repo; commits on exit
+            ingest_repo(conn, repo, label_map, issue_limit, commit_limit)
     
     conn.close()
     print("Done. Data stored in", DB_PATH)
@@ -5,8 +5,52 @@ import subprocess
 import re
 import time
 
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+# NVML device handle, created on first use and reused for every sample
+_nvml_handle = None
+_nvml_initialized = False
+# Set once NVML fails; nvidia-smi is used from then on
+_nvml_failed = False
+
+def get_nvml_stats():
+    """Get GPU stats through NVML (no nvidia-smi process per sample)"""
+    global _nvml_handle, _nvml_initialized
+    if _nvml_handle is None:
+        pynvml.nvmlInit()
+        _nvml_initialized = True
+        _nvml_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+    
+    memory = pynvml.nvmlDeviceGetMemoryInfo(_nvml_handle)
+    return {
+        'temp': pynvml.nvmlDeviceGetTemperature(_nvml_handle, pynvml.NVML_TEMPERATURE_GPU),
+        'mem_used': memory.used >> 20,
+        'mem_total': memory.total >> 20,
+        'load': pynvml.nvmlDeviceGetUtilizationRates(_nvml_handle).gpu
+    }
+
+def shutdown_nvml():
+    """Release NVML, if it was initialised"""
+    global _nvml_handle, _nvml_initialized
+    if _nvml_initialized:
+        pynvml.nvmlShutdown()
+        _nvml_initialized = False
+    _nvml_handle = None
+
 def get_gpu_stats():
     """Get GPU temperature, memory, and load"""
+    global _nvml_failed
+    if pynvml is not None and not _nvml_failed:
+        try:
+            return get_nvml_stats()
+        except pynvml.NVMLError:
+            # Don't retry NVML every sample; fall back to nvidia-smi for good
+            _nvml_failed = True
+            shutdown_nvml()
+    
     try:
         # Try nvidia-smi with specific query
         result = subprocess.run(
@@ -64,6 +108,9 @@ def monitor_loop(interval=5, duration=60):
                 
     except KeyboardInterrupt:
         print("\n\n✅ Monitoring stopped")
+    
+    finally:
+        shutdown_nvml()
 
 if __name__ == "__main__":
     monitor_loop(interval=2)  # Check every 2 seconds
\ No newline at end of file
@@ -4,6 +4,7 @@ Script 1: Clone and set up repositories for mining
 import os
 import sys
 from pathlib import Path
+from datetime import datetime
 import yaml
 from git import Repo
 from tqdm import tqdm
@@ -12,6 +13,7 @@ import logging
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from bugsage.utils.git_ops import ensure_commit_graph
 from bugsage.utils.logging import setup_logging
 
 logger = setup_logging("setup_repos")
@@ -88,29 +90,33 @@ def clone_or_update_repo(repo_config, base_path="data/raw"):
             logger.error(f"❌ Error cloning repository: {e}")
             return None
     
+    # One-time index for the history walks in later steps
+    logger.info("Writing commit-graph (skipped if present)...")
+    ensure_commit_graph(str(repo_path))
+    
     # Get repository statistics
     try:
         repo = Repo(repo_path)
         
-        # Count commits
-        commit_count = sum(1 for _ in repo.iter_commits())
-        
+        # Count commits (counted inside git, nothing formatted per commit)
+        commit_count = int(repo.git.rev_list("--count", "HEAD"))
+
         # Get branches
         branches = [b.name for b in repo.branches]
-        
-        # Get date range
-        commits_list = list(repo.iter_commits(max_count=1))
-        if commits_list:
-            latest_commit = commits_list[0]
-            first_commits = list(repo.iter_commits(max_count=1, reverse=True))
-            if first_commits:
-                first_commit = first_commits[0]
-                
-                logger.info(f"\nRepository Statistics:")
-                logger.info(f"  Total commits: {commit_count:,}")
-                logger.info(f"  Branches: {', '.join(branches[:5])}")
-                logger.info(f"  First commit: {first_commit.committed_datetime.strftime('%Y-%m-%d')}")
-                logger.info(f"  Latest commit: {latest_commit.committed_datetime.strftime('%Y-%m-%d')}")
+
+        # Get date range: HEAD for the latest, the oldest root commit for the first
+        if commit_count:
+            latest_ts = repo.git.log("-1", "--format=%ct")
+            first_root = repo.git.rev_list("--max-parents=0", "HEAD").split()[-1]
+            first_ts = repo.git.log("-1", "--format=%ct", first_root)
+            latest_date = datetime.fromtimestamp(int(latest_ts))
+            first_date = datetime.fromtimestamp(int(first_ts))
+
+            logger.info(f"\nRepository Statistics:")
+            logger.info(f"  Total commits: {commit_count:,}")
+            logger.info(f"  Branches: {', '.join(branches[:5])}")
+            logger.info(f"  First commit: {first_date.strftime('%Y-%m-%d')}")
+            logger.info(f"  Latest commit: {latest_date.strftime('%Y-%m-%d')}")
         
     except Exception as e:
         logger.warning(f"Could not get repository statistics: {e}")
@@ -3,10 +3,12 @@ Script 2: Extract commits from repository
 Mines commits with diffs, metadata, and statistics
 """
 import os
+import re
 import sys
 from pathlib import Path
 import yaml
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from tqdm import tqdm
 import logging
@@ -14,6 +16,7 @@ import logging
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from bugsage.utils import git_ops
 from bugsage.utils.logging import setup_logging
 from bugsage.utils.git_ops import (
     list_commits, get_commit_info, get_diff, Diff, CommitInfo
@@ -21,6 +24,26 @@ from bugsage.utils.git_ops import (
 
 logger = setup_logging("extract_commits")
 
+# Issue references, tried in order ("fixes #123" is covered by the bare "#123" form)
+ISSUE_ID_PATTERNS = (
+    re.compile(r'#(\d+)'),
+    re.compile(r'GH-(\d+)', re.IGNORECASE),
+)
+
+# Any of these in a commit message marks it as a bug fix
+BUGFIX_PATTERN = re.compile(
+    r'fix|bug|issue|problem|error|crash|failure|incorrect|wrong',
+    re.IGNORECASE
+)
+
+# Commits handed to a worker per round trip
+COMMIT_CHUNKSIZE = 64
+
+# Per-worker state, set once by _init_worker
+_REPO_PATH = None
+_CONFIG = None
+_PATH_FILTERS = None
+
 
 def load_repo_config(config_path):
     """Load repository configuration"""
@@ -49,16 +72,8 @@ def extract_issue_id(commit_message):
     - fixes #12345
     - closes #12345
     """
-    import re
-    
-    patterns = [
-        r'#(\d+)',
-        r'GH-(\d+)',
-        r'(?:fix|fixes|fixed|close|closes|closed|resolve|resolves|resolved)\s+#(\d+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, commit_message, re.IGNORECASE)
+    for pattern in ISSUE_ID_PATTERNS:
+        match = pattern.search(commit_message)
         if match:
             return match.group(1)
     
@@ -67,43 +82,57 @@ def extract_issue_id(commit_message):
 
 def is_bugfix_commit(commit_message):
     """Determine if commit is a bug fix based on message"""
-    message_lower = commit_message.lower()
+    return BUGFIX_PATTERN.search(commit_message) is not None
+
+
+def compile_path_filters(config):
+    """
+    Build the file path filters once per run
     
-    bugfix_keywords = [
-        'fix', 'bug', 'issue', 'problem', 'error',
-        'crash', 'failure', 'incorrect', 'wrong'
-    ]
+    Args:
+        config: Repository configuration
     
-    return any(keyword in message_lower for keyword in bugfix_keywords)
+    Returns:
+        tuple: (extension tuple for str.endswith, compiled exclude-path
+        alternation or None)
+    """
+    filters = config['extraction']
+    include_exts = tuple(filters.get('include_extensions', []))
+    exclude_paths = filters.get('exclude_paths', [])
+    exclude_pattern = (
+        re.compile("|".join(map(re.escape, exclude_paths))) if exclude_paths else None
+    )
+    return include_exts, exclude_pattern
 
 
-def should_include_commit(commit_info, diff, config):
+def should_include_commit(commit_info, config, path_filters=None):
     """
     Determine if commit should be included based on filters
     
+    Only needs commit metadata, so it runs before the (expensive) diff.
+    
     Args:
         commit_info: CommitInfo object
-        diff: Diff object
         config: Repository configuration
+        path_filters: Result of compile_path_filters(config); built here
+            if not given
     
     Returns:
         tuple: (should_include, reason)
     """
     filters = config['extraction']
+    files_changed = commit_info.files_changed
     
-    # Check if merge commit
-    if filters.get('exclude_merges', True):
-        if 'merge' in commit_info.message.lower():
-            return False, "merge_commit"
+    # Cheapest checks first: most rejected commits never reach the scans below
     
     # Check number of files changed
     min_files = filters.get('min_files_changed', 1)
     max_files = filters.get('max_files_changed', 50)
     
-    if len(commit_info.files_changed) < min_files:
+    if len(files_changed) < min_files:
         return False, "too_few_files"
     
-    if len(commit_info.files_changed) > max_files:
+    if len(files_changed) > max_files:
         return False, "too_many_files"
     
     # Check lines changed
@@ -117,29 +146,99 @@ def should_include_commit(commit_info, diff, config):
     if total_lines > max_lines:
         return False, "too_many_lines"
     
-    # Check file extensions
-    include_exts = filters.get('include_extensions', [])
+    include_exts, exclude_pattern = path_filters or compile_path_filters(config)
+    
+    # Check file extensions (endswith takes the whole tuple in one call)
     if include_exts:
-        has_valid_ext = any(
-            any(f.endswith(ext) for ext in include_exts)
-            for f in commit_info.files_changed
-        )
+        has_valid_ext = any(f.endswith(include_exts) for f in files_changed)
         if not has_valid_ext:
             return False, "no_valid_extensions"
     
-    # Check excluded paths
-    exclude_paths = filters.get('exclude_paths', [])
-    if exclude_paths:
-        has_excluded = any(
-            any(ex in f for ex in exclude_paths)
-            for f in commit_info.files_changed
-        )
+    # Check excluded paths (one alternation instead of a scan per path)
+    if exclude_pattern is not None:
+        has_excluded = any(exclude_pattern.search(f) for f in files_changed)
         if has_excluded:
             return False, "excluded_path"
     
     return True, "included"
 
 
+def _init_worker(repo_path, config):
+    """Store the repository, config and compiled filters once per worker process"""
+    global _REPO_PATH, _CONFIG, _PATH_FILTERS
+    _REPO_PATH = repo_path
+    _CONFIG = config
+    _PATH_FILTERS = compile_path_filters(config)
+    # Optional on-disk cache of parsed commits (unbounded; off unless configured)
+    cache_dir = config['extraction'].get('cache_dir')
+    git_ops.CACHE_DIR = Path(cache_dir) if cache_dir else None
+
+
+def _process_sha(sha):
+    """
+    Extract the commit record and per-file records for one commit
+    (runs in a worker process)
+    
+    Args:
+        sha: Commit SHA
+    
+    Returns:
+        tuple: (reason, commit_record, file_records) - reason is None if the
+        commit failed, commit_record is None unless the commit was included
+    """
+    repo_name = _CONFIG['repository']['name']
+    
+    try:
+        # Get commit info
+        commit_info = get_commit_info(_REPO_PATH, sha)
+        
+        # Check filters (metadata only; rejected commits are never diffed)
+        include, reason = should_include_commit(commit_info, _CONFIG, _PATH_FILTERS)
+        
+        if not include:
+            return reason, None, []
+        
+        # Get diff
+        diff = get_diff(_REPO_PATH, sha, commit_info=commit_info)
+        
+        # Extract issue ID
+        issue_id = extract_issue_id(commit_info.message)
+        
+        # Determine if bugfix
+        is_bugfix = is_bugfix_commit(commit_info.message)
+        
+        # Commit-level fields (and the patch) are stored once per commit
+        commit_record = {
+            'project': repo_name,
+            'repo': repo_name,
+            'commit_sha': commit_info.sha,
+            'parent_sha': commit_info.parent_sha,
+            'commit_time': commit_info.commit_time,
+            'author': commit_info.author,
+            'author_email': commit_info.author_email,
+            'message': commit_info.message,
+            'files_changed': len(commit_info.files_changed),
+            'insertions': commit_info.insertions,
+            'deletions': commit_info.deletions,
+            'hunks_count': len(diff.hunks),
+            'issue_id': issue_id,
+            'is_bugfix': is_bugfix,
+            'patch_text': diff.raw_diff,
+        }
+        
+        # One record for each file changed, joined back on commit_sha
+        file_records = [
+            {'commit_sha': commit_info.sha, 'file_path': file_path}
+            for file_path in commit_info.files_changed
+        ]
+        
+        return reason, commit_record, file_records
+    
+    except Exception as e:
+        logger.warning(f"Error processing commit {sha[:8]}: {e}")
+        return None, None, []
+
+
 def extract_commits(repo_path, config):
     """
     Extract commits from repository
@@ -149,7 +248,8 @@ def extract_commits(repo_path, config):
         config: Repository configuration
     
     Returns:
-        pandas.DataFrame with extracted commits
+        tuple: (commits_df, files_df) - one row per included commit, and one
+        row per (commit_sha, file_path) pair
     """
     repo_name = config['repository']['name']
     logger.info(f"Extracting commits from {repo_name}...")
@@ -169,13 +269,17 @@ def extract_commits(repo_path, config):
     
     logger.info(f"Branch: {branch}")
     
+    # Merge commits are dropped by git itself while listing
+    exclude_merges = config['extraction'].get('exclude_merges', True)
+    
     # List all commits
     logger.info("Listing commits...")
     commit_shas = list_commits(
         repo_path,
         since=start_date,
         until=end_date,
-        branch=branch
+        branch=branch,
+        exclude_merges=exclude_merges
     )
     
     total_commits = len(commit_shas)
@@ -183,72 +287,52 @@ def extract_commits(repo_path, config):
     
     if total_commits == 0:
         logger.warning("No commits found! Check date range and branch.")
-        return pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame()
     
     # Extract commit data
-    records = []
+    commit_records = []
+    file_records = []
     filter_stats = {}
     
     logger.info("Extracting commit details...")
     
-    for sha in tqdm(commit_shas, desc="Processing commits"):
-        try:
-            # Get commit info
-            commit_info = get_commit_info(repo_path, sha)
-            
-            # Get diff
-            diff = get_diff(repo_path, sha)
-            
-            # Check filters
-            include, reason = should_include_commit(commit_info, diff, config)
+    # Diff parsing is CPU bound, so fan commits out over worker processes
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(repo_path, config)
+    ) as executor:
+        results = executor.map(_process_sha, commit_shas, chunksize=COMMIT_CHUNKSIZE)
+        
+        for reason, commit_record, files in tqdm(results, total=total_commits, desc="Processing commits"):
+            if reason is None:
+                continue
             
             # Track filter statistics
             filter_stats[reason] = filter_stats.get(reason, 0) + 1
             
-            if not include:
-                continue
-            
-            # Extract issue ID
-            issue_id = extract_issue_id(commit_info.message)
-            
-            # Determine if bugfix
-            is_bugfix = is_bugfix_commit(commit_info.message)
-            
-            # Create record for each file changed
-            for file_path in commit_info.files_changed:
-                record = {
-                    'project': repo_name,
-                    'repo': repo_name,
-                    'commit_sha': commit_info.sha,
-                    'parent_sha': commit_info.parent_sha,
-                    'commit_time': commit_info.commit_time,
-                    'author': commit_info.author,
-                    'author_email': commit_info.author_email,
-                    'message': commit_info.message,
-                    'file_path': file_path,
-                    'files_changed': len(commit_info.files_changed),
-                    'insertions': commit_info.insertions,
-                    'deletions': commit_info.deletions,
-                    'hunks_count': len(diff.hunks),
-                    'issue_id': issue_id,
-                    'is_bugfix': is_bugfix,
-                    'patch_text': diff.raw_diff,
-                }
-                
-                records.append(record)
-        
-        except Exception as e:
-            logger.warning(f"Error processing commit {sha[:8]}: {e}")
-            continue
+            if commit_record is not None:
+                commit_records.append(commit_record)
+                file_records.extend(files)
     
-    # Create DataFrame
-    df = pd.DataFrame(records)
+    # Create DataFrames
+    df = pd.DataFrame(commit_records)
+    files_df = pd.DataFrame(file_records, columns=['commit_sha', 'file_path'])
+    
+    # file_path repeats heavily across commits; categorical stores (and groups by) int codes
+    files_df['file_path'] = files_df['file_path'].astype('category')
+    
+    # Counts are small ints; int32 halves them from int64 and still leaves
+    # headroom for downstream sums/differences (e.g. insertions - deletions)
+    if len(df) > 0:
+        count_cols = ['files_changed', 'insertions', 'deletions', 'hunks_count']
+        df[count_cols] = df[count_cols].astype('int32')
     
     # Log statistics
     logger.info(f"\n📊 Extraction Statistics:")
     logger.info(f"  Total commits scanned: {total_commits:,}")
     logger.info(f"  Commits included: {filter_stats.get('included', 0):,}")
-    logger.info(f"  Total records (commit-file pairs): {len(df):,}")
+    logger.info(f"  Total records (commit-file pairs): {len(files_df):,}")
     logger.info(f"\n  Filter breakdown:")
     
     for reason, count in sorted(filter_stats.items()):
@@ -260,7 +344,7 @@ def extract_commits(repo_path, config):
         logger.info(f"  Commits with issue IDs: {df['issue_id'].notna().sum():,} ({df['issue_id'].notna().mean()*100:.1f}%)")
         logger.info(f"  Date range: {df['commit_time'].min()} to {df['commit_time'].max()}")
     
-    return df
+    return df, files_df
 
 
 def main():
@@ -293,21 +377,26 @@ def main():
     print()
     
     # Extract commits
-    df = extract_commits(str(repo_path), config)
+    df, files_df = extract_commits(str(repo_path), config)
     
     if len(df) == 0:
         logger.error("No commits extracted!")
         return
     
-    # Save raw commits
-    output_path = Path(config['output']['raw_commits'])
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    logger.info(f"\n💾 Saving to: {output_path}")
-    df.to_csv(output_path, index=False)
+    # Save raw commits and their changed files (join on commit_sha)
+    outputs = [
+        (df, Path(config['output']['raw_commits'])),
+        (files_df, Path(config['output']['raw_files'])),
+    ]
     
-    file_size_mb = output_path.stat().st_size / (1024 * 1024)
-    logger.info(f"✅ Saved {len(df):,} records ({file_size_mb:.2f} MB)")
+    for table, output_path in outputs:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        logger.info(f"\n💾 Saving to: {output_path}")
+        table.to_parquet(output_path, index=False, compression='zstd')
+        
+        file_size_mb = output_path.stat().st_size / (1024 * 1024)
+        logger.info(f"✅ Saved {len(table):,} records ({file_size_mb:.2f} MB)")
     
     print()
     print("=" * 70)
@@ -2,7 +2,6 @@
 Create BugSage+ project structure
 """
 import os
-from pathlib import Path
 
 def create_structure():
     dirs = [
@@ -40,13 +39,18 @@ def create_structure():
     print("Creating BugSage+ structure...\n")
     
     for dir_path in dirs:
-        Path(dir_path).mkdir(parents=True, exist_ok=True)
+        os.makedirs(dir_path, exist_ok=True)
         
-        # Create __init__.py for Python packages
-        if dir_path.startswith("src/") or dir_path.startswith("tests/"):
-            init_file = Path(dir_path) / "__init__.py"
-            if not init_file.exists():
-                init_file.write_text("# BugSage+ module\n")
+        # Create __init__.py for Python packages (O_EXCL makes the create
+        # itself the existence check, so no separate stat per file)
+        if dir_path.startswith(("src/", "tests/")):
+            try:
+                fd = os.open(os.path.join(dir_path, "__init__.py"), os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            except FileExistsError:
+                pass
+            else:
+                with os.fdopen(fd, "w") as f:
+                    f.write("# BugSage+ module\n")
         
         print(f"✅ {dir_path}")
     
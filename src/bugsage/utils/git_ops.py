@@ -2,15 +2,39 @@
 Git operations for mining commits and extracting diffs
 """
 
-from dataclasses import dataclass
+import atexit
+import hashlib
+import io
+import os
+import pickle
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict
-import git
-from unidiff import PatchSet
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Dict, Tuple
+import numpy as np
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
-@dataclass
+# Parsed commits never change for a given SHA, so results can be kept on disk.
+# Off by default: the store is unbounded, so callers that want it set a
+# directory (and clear it themselves). Bump _CACHE_VERSION when
+# Hunk/Diff/CommitInfo change.
+CACHE_DIR: Optional[Path] = None
+_CACHE_VERSION = 5
+_FULL_SHA = re.compile(r"[0-9a-f]{40}")
+
+
+# Frozen, with read-only arrays and tuple contents: split_hunks hands the same
+# objects to every caller parsing the same text. Array fields have no scalar ==.
+@dataclass(eq=False, frozen=True)
 class Hunk:
     """Represents a contiguous block of changes in a diff"""
     hunk_id: int
@@ -19,9 +43,27 @@ class Hunk:
     old_lines: int
     new_start: int
     new_lines: int
-    content: str
-    added_lines: List[tuple]  # (line_num, content)
-    removed_lines: List[tuple]  # (line_num, content)
+    content_bytes: bytes  # raw UTF-8 hunk text; see .content
+    # Changed lines stored column-wise: int32 line numbers + contents
+    added_line_nos: np.ndarray
+    added_line_contents: Tuple[str, ...]
+    removed_line_nos: np.ndarray
+    removed_line_contents: Tuple[str, ...]
+    
+    @property
+    def content(self) -> str:
+        """Hunk text, decoded on access"""
+        return self.content_bytes.decode("utf-8", errors="replace")
+    
+    @property
+    def added_lines(self) -> List[tuple]:
+        """(line_num, content) pairs for added lines"""
+        return list(zip(self.added_line_nos.tolist(), self.added_line_contents))
+    
+    @property
+    def removed_lines(self) -> List[tuple]:
+        """(line_num, content) pairs for removed lines"""
+        return list(zip(self.removed_line_nos.tolist(), self.removed_line_contents))
 
 
 @dataclass
@@ -44,17 +86,213 @@ class CommitInfo:
     message: str
     author: str
     author_email: str
-    commit_time: datetime
+    commit_time_epoch: int
     files_changed: List[str]
     insertions: int
     deletions: int
+    
+    @property
+    def commit_time(self) -> datetime:
+        # Built on access: batch listings often never touch the datetime
+        return datetime.fromtimestamp(self.commit_time_epoch)
+
+
+_BATCHERS: Dict[Tuple[str, int], "BlobBatcher"] = {}
+
+
+def _open_batcher(repo_path: str) -> "BlobBatcher":
+    """
+    Get the blob reader for a repository, reusing it across calls.
+    
+    Readers are keyed by resolved path, so "." and an absolute path share
+    one process, and by process id so forked workers never share the
+    parent's cat-file pipe.
+    """
+    key = (str(Path(repo_path).resolve()), os.getpid())
+    batcher = _BATCHERS.get(key)
+    if batcher is not None and batcher.proc.poll() is not None:
+        # The process died (killed, repository moved); replace it
+        batcher.close()
+        batcher = None
+    if batcher is None:
+        batcher = _BATCHERS[key] = BlobBatcher(key[0])
+    return batcher
+
+
+def close_blob_readers() -> None:
+    """Stop this process's cached `git cat-file` readers (also run at exit)."""
+    pid = os.getpid()
+    for (_, owner), batcher in _BATCHERS.items():
+        if owner == pid:
+            batcher.close()
+    _BATCHERS.clear()
+
+
+atexit.register(close_blob_readers)
+
+
+def _git(repo_path: str, *args: str, input: Optional[str] = None) -> str:
+    """Run a git command inside the repository and return its stdout."""
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), *args],
+        input=input.encode("utf-8") if input is not None else None,
+        stdout=subprocess.PIPE,
+        check=True
+    )
+    # Decode by hand: text mode would also rewrite \r\n inside diffs
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def _rev_exists(repo_path: str, rev: str) -> bool:
+    """Check whether a revision resolves to a commit."""
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    return result.returncode == 0
+
+
+_COMMIT_GRAPH_CHECKED = set()
+
+
+def ensure_commit_graph(repo_path: str) -> None:
+    """
+    Write git's commit-graph file, with changed-path Bloom filters, if missing.
+    
+    The graph lets git walk history without inflating every commit and lets
+    path-limited logs skip commits that cannot touch the path. This writes
+    into the repository, so it is a setup step (scripts/01_setup_repos.py),
+    not something the query functions do. Checked once per repository per
+    process; failures (e.g. read-only clones) are ignored.
+    
+    Args:
+        repo_path: Path to git repository
+    """
+    key = str(Path(repo_path).resolve())
+    if key in _COMMIT_GRAPH_CHECKED:
+        return
+    _COMMIT_GRAPH_CHECKED.add(key)
+    
+    try:
+        info_dir = Path(repo_path) / _git(repo_path, "rev-parse", "--git-path", "objects/info").strip()
+        if (info_dir / "commit-graph").exists() or (info_dir / "commit-graphs").exists():
+            return
+        _git(repo_path, "commit-graph", "write", "--reachable", "--changed-paths", "--no-progress")
+    except (subprocess.CalledProcessError, OSError):
+        pass
+
+
+# One record per commit: NUL-separated header fields, then -z numstat entries.
+# Merges are diffed against their first parent and renames count as
+# delete + add, which is what GitPython's commit.stats reported.
+_LOG_FORMAT = "--format=%x1e%H%x00%P%x00%an%x00%ae%x00%ct%x00%B%x00"
+_LOG_STAT_ARGS = (
+    _LOG_FORMAT, "-z", "--numstat", "--no-renames", "--root", "--diff-merges=first-parent"
+)
+
+
+def _parse_numstat(entries: List[str]) -> Tuple[List[str], int, int]:
+    """
+    Total up `--numstat -z` entries.
+    
+    Args:
+        entries: NUL-separated numstat fields
+    
+    Returns:
+        Tuple of (files changed, insertions, deletions); a detected rename
+        contributes both its old and new path
+    """
+    files_changed = []
+    insertions = 0
+    deletions = 0
+    
+    entries = iter(entries)
+    for entry in entries:
+        entry = entry.lstrip("\n")
+        if not entry:
+            continue
+        added, removed, path = entry.split("\t", 2)
+        # Binary files report "-" instead of line counts
+        insertions += int(added) if added != "-" else 0
+        deletions += int(removed) if removed != "-" else 0
+        if path:
+            files_changed.append(path)
+        else:
+            # Renames leave the path empty and follow with old and new names
+            files_changed.extend((next(entries), next(entries)))
+    
+    return files_changed, insertions, deletions
+
+
+def _parse_log(output: str) -> List[CommitInfo]:
+    """
+    Parse `git log` output produced with _LOG_STAT_ARGS.
+    
+    Args:
+        output: Raw stdout of git log
+    
+    Returns:
+        List of CommitInfo objects in log order
+    """
+    commits = []
+    
+    for record in output.split("\x1e")[1:]:
+        fields = record.split("\0")
+        sha, parents, author, author_email, timestamp, message = fields[:6]
+        
+        files_changed, insertions, deletions = _parse_numstat(fields[6:])
+        
+        commits.append(CommitInfo(
+            sha=sha,
+            parent_sha=parents.split()[0] if parents else None,
+            message=message.strip(),
+            author=author,
+            author_email=author_email,
+            commit_time_epoch=int(timestamp),
+            files_changed=files_changed,
+            insertions=insertions,
+            deletions=deletions
+        ))
+    
+    return commits
+
+
+def _resolve_branch(repo_path: str, branch: str) -> str:
+    """Fall back from a missing master to main, then to the checked-out branch."""
+    if not _rev_exists(repo_path, branch):
+        if branch == "master" and _rev_exists(repo_path, "main"):
+            return "main"
+        elif branch == "master":
+            # Get default branch
+            return _git(repo_path, "symbolic-ref", "--short", "HEAD").strip()
+    return branch
+
+
+def _rev_list_filters(
+    since: Optional[datetime],
+    until: Optional[datetime],
+    exclude_merges: bool
+) -> List[str]:
+    """rev-list options for the date range and merge filters."""
+    args = []
+    if since:
+        args.append(f"--since={since.strftime('%Y-%m-%d %H:%M:%S')}")
+    if until:
+        args.append(f"--until={until.strftime('%Y-%m-%d %H:%M:%S')}")
+    if exclude_merges:
+        args.append("--no-merges")
+    return args
 
 
 def list_commits(
     repo_path: str,
     since: Optional[datetime] = None,
     until: Optional[datetime] = None,
-    branch: str = "master"
+    branch: str = "master",
+    exclude_merges: bool = False,
+    stop_at: Optional[Iterable[str]] = None,
+    limit: Optional[int] = None
 ) -> List[str]:
     """
     List commit SHAs in a repository within a time range.
@@ -64,36 +302,111 @@ def list_commits(
         since: Start date (inclusive)
         until: End date (inclusive)
         branch: Branch name to traverse
+        exclude_merges: Skip merge commits (git log --no-merges)
+        stop_at: Already-processed SHAs; they and their ancestors are skipped
+        limit: Return at most this many commits
     
     Returns:
         List of commit SHAs (most recent first)
     """
-    repo = git.Repo(repo_path)
+    branch = _resolve_branch(repo_path, branch)
     
-    # Check if branch exists, fallback to main if not
-    try:
-        repo.commit(branch)
-    except:
-        if branch == "master":
-            try:
-                repo.commit("main")
-                branch = "main"
-            except:
-                # Get default branch
-                branch = repo.active_branch.name
-    
-    # Build kwargs for iter_commits
-    kwargs = {"rev": branch}
-    if since:
-        kwargs["since"] = since
-    if until:
-        kwargs["until"] = until
+    # Let git do the traversal; we only need the SHAs
+    args = ["rev-list", branch, *_rev_list_filters(since, until, exclude_merges)]
+    if limit is not None:
+        args.append(f"--max-count={limit}")
     
-    commits = []
-    for commit in repo.iter_commits(**kwargs):
-        commits.append(commit.hexsha)
+    # Exclusions go through stdin as ^<sha> so git prunes the walk itself,
+    # however many there are
+    excluded = None
+    if stop_at:
+        args.append("--stdin")
+        excluded = "".join(f"^{sha}\n" for sha in stop_at)
     
-    return commits
+    return _git(repo_path, *args, input=excluded).splitlines()
+
+
+def iter_commits_paged(
+    repo_path: str,
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    branch: str = "master",
+    exclude_merges: bool = False,
+    start: int = 0,
+    batch: int = 64,
+    max_limit: int = 1000
+) -> Iterator[str]:
+    """
+    Lazily yield commit SHAs, fetching them from git page by page.
+    
+    The page size doubles after every page (capped at max_limit), so
+    consumers that stop early pay for a small rev-list while long scans
+    still need only a handful of git calls. The branch tip is resolved
+    once, so commits pushed while iterating neither shift nor repeat pages.
+    
+    Args:
+        repo_path: Path to git repository
+        since: Start date (inclusive)
+        until: End date (inclusive)
+        branch: Branch name to traverse
+        exclude_merges: Skip merge commits (git log --no-merges)
+        start: Number of matching commits to skip from the tip
+        batch: Size of the first page
+        max_limit: Largest page size
+    
+    Yields:
+        Commit SHAs (most recent first)
+    """
+    branch = _resolve_branch(repo_path, branch)
+    tip = _git(repo_path, "rev-parse", "--verify", f"{branch}^{{commit}}").strip()
+    filters = _rev_list_filters(since, until, exclude_merges)
+    
+    while True:
+        shas = _git(
+            repo_path, "rev-list", tip, *filters, f"--skip={start}", f"--max-count={batch}"
+        ).splitlines()
+        yield from shas
+        
+        if len(shas) < batch:
+            return
+        start += len(shas)
+        batch = min(batch * 2, max_limit)
+
+
+def _cache_path(kind: str, commit_sha: str) -> Optional[Path]:
+    """Cache file for a commit, or None when caching doesn't apply."""
+    # Short SHAs and refs like HEAD are not stable keys
+    if CACHE_DIR is None or not _FULL_SHA.fullmatch(commit_sha):
+        return None
+    return CACHE_DIR / f"{kind}-v{_CACHE_VERSION}" / commit_sha[:2] / f"{commit_sha}.pkl"
+
+
+def _cache_load(path: Optional[Path]) -> Any:
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def _cache_store(path: Optional[Path], value: Any) -> None:
+    if path is None:
+        return
+    # Write then rename so parallel workers never read a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except (OSError, pickle.PicklingError):
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
 
 
 def get_commit_info(repo_path: str, commit_sha: str) -> CommitInfo:
@@ -107,45 +420,118 @@ def get_commit_info(repo_path: str, commit_sha: str) -> CommitInfo:
     Returns:
         CommitInfo dataclass with metadata
     """
-    repo = git.Repo(repo_path)
-    commit = repo.commit(commit_sha)
-    
-    # Get parent (handle initial commit case)
-    parent_sha = commit.parents[0].hexsha if commit.parents else None
-    
-    # Get stats
-    stats = commit.stats.total
-    files_changed = list(commit.stats.files.keys())
-    
-    return CommitInfo(
-        sha=commit.hexsha,
-        parent_sha=parent_sha,
-        message=commit.message.strip(),
-        author=commit.author.name,
-        author_email=commit.author.email,
-        commit_time=datetime.fromtimestamp(commit.committed_date),
-        files_changed=files_changed,
-        insertions=stats.get("insertions", 0),
-        deletions=stats.get("deletions", 0)
-    )
+    cache_path = _cache_path("commits", commit_sha)
+    commit_info = _cache_load(cache_path)
+    if commit_info is None:
+        output = _git(repo_path, "log", "-1", *_LOG_STAT_ARGS, commit_sha)
+        commit_info = _parse_log(output)[0]
+        _cache_store(cache_path, commit_info)
+    
+    return commit_info
 
 
-def get_diff(repo_path: str, commit_sha: str) -> Diff:
+def get_diff(
+    repo_path: str,
+    commit_sha: str,
+    include_raw: bool = True,
+    commit_info: Optional[CommitInfo] = None
+) -> Diff:
     """
     Extract the full diff for a commit.
     
     Args:
         repo_path: Path to git repository
         commit_sha: Commit SHA to diff
+        include_raw: Keep the unified diff text in Diff.raw_diff; without it
+            the patch is parsed as it streams and never held in memory whole
+        commit_info: This commit's CommitInfo, if the caller already has it;
+            its totals are reused instead of a second git call for them
     
     Returns:
         Diff dataclass containing all changes
     """
-    repo = git.Repo(repo_path)
-    commit = repo.commit(commit_sha)
+    cache_path = _cache_path("diffs", commit_sha)
+    diff = _cache_load(cache_path)
+    if diff is None:
+        diff = _read_diff(repo_path, commit_sha, include_raw, commit_info)
+        # Only complete diffs are worth reusing
+        if include_raw:
+            _cache_store(cache_path, diff)
+    elif not include_raw:
+        diff = replace(diff, raw_diff="")
+    
+    return diff
+
+
+# Parents and patch from one git call. log.showRoot=false skips diffing the
+# initial commit, which is reported as empty. Stats are not taken from here:
+# the patch detects renames, while Diff totals match CommitInfo's.
+_DIFF_ARGS = (
+    "-c", "log.showRoot=false", "log", "-1", "--format=%x1e%P%x00",
+    "-z", "-p", "-M", "-U3", "--diff-merges=first-parent"
+)
+
+
+def _patch_lines(first: bytes, stream: BinaryIO, raw_lines: Optional[List[bytes]]) -> Iterator[bytes]:
+    """
+    Yield patch lines as git writes them.
+    
+    The final newline is dropped, as GitPython did for the whole output, so
+    hunks parse exactly as they did from the buffered string.
+    """
+    previous = first
+    for line in stream:
+        if previous:
+            if raw_lines is not None:
+                raw_lines.append(previous)
+            yield previous
+        previous = line
+    
+    last = previous[:-1] if previous.endswith(b"\n") else previous
+    if last:
+        if raw_lines is not None:
+            raw_lines.append(last)
+        yield last
+
+
+def _read_diff(
+    repo_path: str,
+    commit_sha: str,
+    include_raw: bool = True,
+    commit_info: Optional[CommitInfo] = None
+) -> Diff:
+    """Stream git's output for get_diff through the hunk parser."""
+    proc = subprocess.Popen(
+        ["git", "-C", str(repo_path), *_DIFF_ARGS, commit_sha],
+        stdout=subprocess.PIPE,
+        bufsize=1 << 20
+    )
+    with proc:
+        # The NUL-terminated header ends with an empty field
+        head = b""
+        while b"\0\0" not in head:
+            line = proc.stdout.readline()
+            if not line:
+                break
+            head += line
+        head, _, first_line = head.partition(b"\0\0")
+        parents = head.decode("utf-8", errors="replace").lstrip("\x1e").split()
+        # git separates the header from the patch with a newline
+        if first_line.startswith(b"\n"):
+            first_line = first_line[1:]
+        
+        raw_lines = [] if include_raw else None
+        lines = _patch_lines(first_line, proc.stdout, raw_lines)
+        hunks = _parse_hunks(lines) if parents else []
+        # Drain whatever the parser left so git can exit
+        for _ in lines:
+            pass
+    
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
     
     # Handle initial commit
-    if not commit.parents:
+    if not parents:
         return Diff(
             commit_sha=commit_sha,
             parent_sha=None,
@@ -156,30 +542,114 @@ def get_diff(repo_path: str, commit_sha: str) -> Diff:
             raw_diff=""
         )
     
-    parent = commit.parents[0]
+    # Same --no-renames numstat as get_commit_info, so both report identical
+    # totals for a commit
+    stats = commit_info if commit_info is not None else get_commit_info(repo_path, commit_sha)
     
-    # Get unified diff
-    raw_diff = repo.git.diff(parent.hexsha, commit_sha, unified=3)
-    
-    # Parse diff
-    hunks = split_hunks(raw_diff)
-    
-    stats = commit.stats.total
     return Diff(
         commit_sha=commit_sha,
-        parent_sha=parent.hexsha,
+        parent_sha=parents[0],
         hunks=hunks,
-        files_changed=list(commit.stats.files.keys()),
-        insertions=stats.get("insertions", 0),
-        deletions=stats.get("deletions", 0),
-        raw_diff=raw_diff
+        files_changed=list(stats.files_changed),
+        insertions=stats.insertions,
+        deletions=stats.deletions,
+        raw_diff=b"".join(raw_lines).decode("utf-8", errors="replace") if include_raw else ""
     )
 
 
+_WORKER_REPO_PATH = None
+
+
+def _init_diff_worker(repo_path: str) -> None:
+    global _WORKER_REPO_PATH
+    _WORKER_REPO_PATH = repo_path
+
+
+def _diff_in_worker(commit_sha: str) -> Diff:
+    return get_diff(_WORKER_REPO_PATH, commit_sha)
+
+
+def get_diffs_batch(
+    repo_path: str,
+    shas: List[str],
+    workers: Optional[int] = None,
+    chunksize: int = 16
+) -> List[Diff]:
+    """
+    Extract diffs for many commits in parallel worker processes.
+    
+    Parsing is CPU-bound Python, so processes rather than threads. Workers
+    only receive the repository path and call get_diff without a
+    CommitInfo, so each commit costs a `git log -p` for the patch plus a
+    `git log --numstat` for the totals (unless CACHE_DIR already has them).
+    
+    Args:
+        repo_path: Path to git repository
+        shas: Commit SHAs to diff
+        workers: Number of worker processes (defaults to CPU count)
+        chunksize: SHAs sent to a worker per task
+    
+    Returns:
+        List of Diff objects, in the same order as shas
+    """
+    if not shas:
+        return []
+    
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_diff_worker,
+        initargs=(repo_path,)
+    ) as executor:
+        return list(executor.map(_diff_in_worker, shas, chunksize=chunksize))
+
+
+_HUNK_HEADER = re.compile(rb"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_PATH_PREFIX = re.compile(r"^[abciow12]/")
+_NO_NEWLINE_MARKER = b"\\ No newline at end of file\n"
+
+
+def _header_path(line: bytes) -> str:
+    """Extract the file name from a ---/+++ header line."""
+    return line[4:].rstrip(b"\n").split(b"\t", 1)[0].decode("utf-8", errors="replace")
+
+
+def _strip_path_prefix(path: str) -> str:
+    """Drop git's a/ b/ prefix, keeping C-style quotes if git added them."""
+    quoted = len(path) > 1 and path.startswith('"') and path.endswith('"')
+    if quoted:
+        path = path[1:-1]
+    path = _PATH_PREFIX.sub("", path, count=1)
+    return f'"{path}"' if quoted else path
+
+
+def _line_numbers(values: List[int]) -> np.ndarray:
+    """Read-only int32 array of line numbers for a Hunk."""
+    array = np.asarray(values, dtype=np.int32)
+    array.flags.writeable = False
+    return array
+
+
+def _content_key(data: bytes) -> bytes:
+    """128-bit digest for in-process cache keys (xxh3 when available)."""
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# LRU of parsed hunks keyed by a digest of the diff text
+SPLIT_CACHE_SIZE = 256
+_split_cache: "OrderedDict[bytes, List[Hunk]]" = OrderedDict()
+_split_cache_lock = threading.Lock()
+
+
 def split_hunks(diff_text: str) -> List[Hunk]:
     """
     Split a unified diff into individual hunks.
     
+    Single pass over the lines: file headers set the current path, hunk
+    headers set the expected line counts, and body lines are classified by
+    their first character until those counts are used up.
+    
     Args:
         diff_text: Raw unified diff string
     
@@ -189,45 +659,194 @@ def split_hunks(diff_text: str) -> List[Hunk]:
     if not diff_text.strip():
         return []
     
+    # Re-parsing the same text returns the cached hunks (shared objects)
+    diff_bytes = diff_text.encode("utf-8", "surrogatepass")
+    key = _content_key(diff_bytes)
+    with _split_cache_lock:
+        hunks = _split_cache.get(key)
+        if hunks is not None:
+            _split_cache.move_to_end(key)
+            return list(hunks)
+    
+    hunks = _parse_hunks(io.BytesIO(diff_bytes))
+    
+    with _split_cache_lock:
+        _split_cache[key] = hunks
+        if len(_split_cache) > SPLIT_CACHE_SIZE:
+            _split_cache.popitem(last=False)
+    
+    return list(hunks)
+
+
+def _parse_hunks(lines: Iterable[bytes]) -> List[Hunk]:
+    """
+    Parse hunks from raw diff lines; see split_hunks.
+    
+    Works on bytes: hunk text is concatenated undecoded and only changed
+    lines are decoded, since those are the ones callers read one by one.
+    """
+    all_hunks = []
+    source_file = None
+    target_file = None
+    
+    # State of the hunk being read; reset by every @@ header
+    hunk_path = None
+    old_start = old_lines = new_start = new_lines = 0
+    old_no = new_no = 0
+    old_left = new_left = 0
+    added_nos = []
+    added_text = []
+    removed_nos = []
+    removed_text = []
+    hunk_content = []
+
     try:
-        patch_set = PatchSet(diff_text)
-    except Exception as e:
+        for line in lines:
+            if old_left > 0 or new_left > 0:
+                tag = line[:1]
+                if tag == b"+":
+                    added_nos.append(new_no)
+                    added_text.append(line[1:].decode("utf-8", errors="replace"))
+                    new_no += 1
+                    new_left -= 1
+                elif tag == b"-":
+                    removed_nos.append(old_no)
+                    removed_text.append(line[1:].decode("utf-8", errors="replace"))
+                    old_no += 1
+                    old_left -= 1
+                elif tag in (b" ", b"\r", b"\n"):
+                    # A bare newline is an empty context line
+                    if tag != b" ":
+                        line = b" " + line
+                    old_no += 1
+                    new_no += 1
+                    old_left -= 1
+                    new_left -= 1
+                elif tag == b"\\":
+                    line = _NO_NEWLINE_MARKER
+                else:
+                    raise ValueError(f"Hunk diff line expected: {line!r}")
+                
+                if old_left < 0 or new_left < 0:
+                    raise ValueError("Hunk is longer than expected")
+                
+                hunk_content.append(line)
+                if old_left == 0 and new_left == 0:
+                    all_hunks.append(Hunk(
+                        hunk_id=len(all_hunks),
+                        file_path=hunk_path,
+                        old_start=old_start,
+                        old_lines=old_lines,
+                        new_start=new_start,
+                        new_lines=new_lines,
+                        content_bytes=b"".join(hunk_content),
+                        added_line_nos=_line_numbers(added_nos),
+                        added_line_contents=tuple(added_text),
+                        removed_line_nos=_line_numbers(removed_nos),
+                        removed_line_contents=tuple(removed_text)
+                    ))
+                continue
+            
+            if line.startswith(b"diff --git "):
+                source_file = target_file = None
+            elif line.startswith(b"--- "):
+                source_file = _header_path(line)
+            elif line.startswith(b"+++ "):
+                target_file = _header_path(line)
+            elif line.startswith(b"@@"):
+                match = _HUNK_HEADER.match(line)
+                if match is None:
+                    continue
+                if target_file is None:
+                    raise ValueError(f"Unexpected hunk found: {line!r}")
+                
+                # Prefer the new name, except for deleted files
+                path = source_file if target_file == "/dev/null" else target_file
+                hunk_path = _strip_path_prefix(path)
+                old_start, old_lines, new_start, new_lines = match.groups()
+                old_start = old_no = int(old_start)
+                new_start = new_no = int(new_start)
+                old_lines = old_left = 1 if old_lines is None else int(old_lines)
+                new_lines = new_left = 1 if new_lines is None else int(new_lines)
+                
+                added_nos = []
+                added_text = []
+                removed_nos = []
+                removed_text = []
+                hunk_content = []
+            elif line.startswith(b"\\") and all_hunks:
+                # Marker for a hunk whose line counts were already used up
+                last = all_hunks[-1]
+                all_hunks[-1] = replace(last, content_bytes=last.content_bytes + _NO_NEWLINE_MARKER)
+        
+        if old_left > 0 or new_left > 0:
+            raise ValueError("Hunk is shorter than expected")
+    except ValueError as e:
         print(f"Warning: Failed to parse diff: {e}")
         return []
     
-    all_hunks = []
-    hunk_counter = 0
+    return all_hunks
+
+
+class BlobBatcher:
+    """
+    Read files at given commits through one long-lived `git cat-file --batch`.
+    
+    Each lookup is a line on stdin and a sized reply on stdout, so thousands
+    of reads cost one process. Usable as a context manager.
+    """
+    
+    def __init__(self, repo_path: str):
+        self.proc = subprocess.Popen(
+            ["git", "-C", str(repo_path), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        self._lock = threading.Lock()
     
-    for patched_file in patch_set:
-        file_path = patched_file.path
+    def get(self, commit_sha: str, file_path: str) -> Optional[bytes]:
+        """
+        Read a file's bytes at a commit.
         
-        for hunk in patched_file:
-            added_lines = []
-            removed_lines = []
-            hunk_content = []
+        Args:
+            commit_sha: Commit SHA
+            file_path: Path to file within repo
+        
+        Returns:
+            File content, or None if the path is missing or not a file
+        """
+        with self._lock:
+            self.proc.stdin.write(f"{commit_sha}:{file_path}\n".encode("utf-8"))
+            self.proc.stdin.flush()
             
-            for line in hunk:
-                hunk_content.append(str(line))
-                
-                if line.is_added:
-                    added_lines.append((line.target_line_no, line.value))
-                elif line.is_removed:
-                    removed_lines.append((line.source_line_no, line.value))
+            # "<oid> <type> <size>", or "<name> missing" / "<name> ambiguous"
+            header = self.proc.stdout.readline()
+            if not header:
+                raise RuntimeError("git cat-file exited unexpectedly")
+            fields = header.split()
+            if fields[-1] in (b"missing", b"ambiguous"):
+                return None
             
-            all_hunks.append(Hunk(
-                hunk_id=hunk_counter,
-                file_path=file_path,
-                old_start=hunk.source_start,
-                old_lines=hunk.source_length,
-                new_start=hunk.target_start,
-                new_lines=hunk.target_length,
-                content="".join(hunk_content),
-                added_lines=added_lines,
-                removed_lines=removed_lines
-            ))
-            hunk_counter += 1
+            data = self.proc.stdout.read(int(fields[2]))
+            self.proc.stdout.read(1)  # trailing newline
+        
+        return data if fields[1] == b"blob" else None
     
-    return all_hunks
+    def close(self) -> None:
+        """Stop the cat-file process."""
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            # Unflushed input to a process that already exited
+            pass
+        self.proc.wait()
+        self.proc.stdout.close()
+    
+    def __enter__(self) -> "BlobBatcher":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 def get_file_content_at_commit(
@@ -246,13 +865,8 @@ def get_file_content_at_commit(
     Returns:
         File content as string, or None if file doesn't exist
     """
-    repo = git.Repo(repo_path)
-    
-    try:
-        commit = repo.commit(commit_sha)
-        return commit.tree[file_path].data_stream.read().decode('utf-8')
-    except (KeyError, AttributeError):
-        return None
+    data = _open_batcher(repo_path).get(commit_sha, file_path)
+    return data.decode('utf-8') if data is not None else None
 
 
 def get_file_history(
@@ -271,10 +885,15 @@ def get_file_history(
     Returns:
         List of CommitInfo objects affecting this file
     """
-    repo = git.Repo(repo_path)
-    
-    commits = []
-    for commit in repo.iter_commits(paths=file_path, max_count=max_count):
-        commits.append(get_commit_info(repo_path, commit.hexsha))
+    # Walk the path-limited history once, then read every commit's metadata
+    # in a single log call. Asking log for merge diffs directly would change
+    # which merges history simplification keeps.
+    args = ["rev-list", "HEAD"]
+    if max_count is not None:
+        args.append(f"--max-count={max_count}")
+    shas = _git(repo_path, *args, "--", file_path)
+    if not shas:
+        return []
     
-    return commits
\ No newline at end of file
+    output = _git(repo_path, "log", "--no-walk=unsorted", "--stdin", *_LOG_STAT_ARGS, input=shas)
+    return _parse_log(output)
\ No newline at end of file
@@ -1,11 +1,66 @@
 """
 Logging utilities for BugSage+
 """
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 from pathlib import Path
 import colorlog
 
+# Formatters are stateless, so every handler shares these
+CONSOLE_FORMAT = colorlog.ColoredFormatter(
+    "%(log_color)s%(levelname)-8s%(reset)s %(message)s",
+    datefmt=None,
+    reset=True,
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+)
+FILE_FORMAT = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# name -> (level, log_file) it was last set up with
+_CONFIGURED = {}
+
+# File output goes through a QueueListener thread per logger, so the threads
+# doing the actual work never block on disk writes. name -> (handler, listener)
+_QUEUED = {}
+
+
+def _stop_listener(name):
+    """Flush and stop the file listener for a logger, if it has one"""
+    entry = _QUEUED.pop(name, None)
+    if entry:
+        entry[1].stop()
+
+
+def _stop_all_listeners():
+    for name in list(_QUEUED):
+        _stop_listener(name)
+
+
+def _unqueue_after_fork():
+    """Forked children don't inherit the listener thread; write directly"""
+    for name, (queue_handler, listener) in _QUEUED.items():
+        logger = logging.getLogger(name)
+        logger.removeHandler(queue_handler)
+        for handler in listener.handlers:
+            logger.addHandler(handler)
+    _QUEUED.clear()
+
+
+atexit.register(_stop_all_listeners)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_unqueue_after_fork)
+
 
 def setup_logging(name="bugsage", level=logging.INFO, log_file=None):
     """
@@ -20,30 +75,24 @@ def setup_logging(name="bugsage", level=logging.INFO, log_file=None):
         Logger instance
     """
     logger = logging.getLogger(name)
+    
+    # Repeat calls (notebook re-runs, worker init) keep the existing handlers
+    config = (level, str(log_file) if log_file else None)
+    if _CONFIGURED.get(name) == config:
+        return logger
+    _CONFIGURED[name] = config
+    
     logger.setLevel(level)
     
     # Remove existing handlers
     logger.handlers = []
+    _stop_listener(name)
     
     # Console handler with colors
     console_handler = colorlog.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     
-    # Color format
-    console_format = colorlog.ColoredFormatter(
-        "%(log_color)s%(levelname)-8s%(reset)s %(message)s",
-        datefmt=None,
-        reset=True,
-        log_colors={
-            'DEBUG': 'cyan',
-            'INFO': 'green',
-            'WARNING': 'yellow',
-            'ERROR': 'red',
-            'CRITICAL': 'red,bg_white',
-        }
-    )
-    
-    console_handler.setFormatter(console_format)
+    console_handler.setFormatter(CONSOLE_FORMAT)
     logger.addHandler(console_handler)
     
     # File handler (optional)
@@ -54,10 +103,16 @@ def setup_logging(name="bugsage", level=logging.INFO, log_file=None):
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(level)
         
-        file_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        file_handler.setFormatter(FILE_FORMAT)
+        
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(level)
+        listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
         )
-        file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
+        listener.start()
+        _QUEUED[name] = (queue_handler, listener)
+        logger.addHandler(queue_handler)
     
     return logger
\ No newline at end of file
@@ -26,10 +26,13 @@ def test_gpu():
             total_memory = torch.cuda.get_device_properties(i).total_memory / 1e9
             print(f"   Total memory: {total_memory:.2f} GB")
             
-            # Test computation
+            # Test computation (tiny on-device matmul: no host RNG or copy;
+            # synchronize so kernel errors surface here)
             try:
-                x = torch.randn(1000, 1000).cuda(i)
-                y = torch.matmul(x, x)
+                with torch.cuda.device(i):
+                    x = torch.randn(16, 16, device='cuda')
+                    y = torch.matmul(x, x)
+                    torch.cuda.synchronize()
                 print(f"   ✅ Computation test: PASSED")
             except Exception as e:
                 print(f"   ❌ Computation test: FAILED - {e}")
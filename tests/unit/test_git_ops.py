@@ -0,0 +1,380 @@
+"""
+Tests for the diff parsing in bugsage.utils.git_ops
+"""
+import dataclasses
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from bugsage.utils import git_ops
+from bugsage.utils.git_ops import (
+    BlobBatcher, get_commit_info, get_diff, get_file_content_at_commit,
+    get_file_history, iter_commits_paged, list_commits, split_hunks
+)
+
+
+RENAME_WITH_EDIT = """diff --git a/pkg/m.py b/pkg/renamed.py
+similarity index 80%
+rename from pkg/m.py
+rename to pkg/renamed.py
+index 7d4290a..a3ef230 100644
+--- a/pkg/m.py
++++ b/pkg/renamed.py
+@@ -1,2 +1,3 @@
+ x = 1
+ y = 2
++z = 3"""
+
+NO_NEWLINE_AT_EOF = """diff --git a/a.py b/a.py
+index b917a72..f2db9da 100644
+--- a/a.py
++++ b/a.py
+@@ -1,2 +1,2 @@
+ print(1)
+-print(2)
+\\ No newline at end of file
++print(22)
+\\ No newline at end of file"""
+
+CRLF_AND_EMPTY_CONTEXT = (
+    "diff --git a/win.txt b/win.txt\n"
+    "--- a/win.txt\n"
+    "+++ b/win.txt\n"
+    "@@ -1,4 +1,4 @@\n"
+    " a\r\n"
+    "\n"
+    "-b\r\n"
+    "+c\r\n"
+    " d\r"
+)
+
+HEADER_LIKE_BODY_LINES = """diff --git a/notes.md b/notes.md
+--- a/notes.md
++++ b/notes.md
+@@ -1,2 +1,2 @@
+ title
+--- old rule
++++ new rule
+@@ -10 +10 @@
+--- x
++++ y"""
+
+SAMPLE_DIFFS = [
+    RENAME_WITH_EDIT,
+    NO_NEWLINE_AT_EOF,
+    CRLF_AND_EMPTY_CONTEXT,
+    HEADER_LIKE_BODY_LINES,
+]
+
+
+def _git(repo, *args, date=None):
+    env = None
+    if date:
+        # Fixed, distinct commit dates keep the history order and date filters stable
+        env = {**os.environ, "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+    subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env
+    )
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory):
+    """
+    Small repository, newest first: merge feat, edit a, add n (on feat),
+    rename and edit, initial
+    """
+    path = tmp_path_factory.mktemp("repo")
+    _git(path, "init", "-q", "-b", "master")
+    _git(path, "config", "user.name", "Tester")
+    _git(path, "config", "user.email", "tester@example.com")
+    
+    (path / "a.py").write_text("print(1)\nprint(2)\n")
+    (path / "pkg").mkdir()
+    (path / "pkg" / "m.py").write_text("".join(f"x{i} = {i}\n" for i in range(10)))
+    _git(path, "add", "-A")
+    _git(path, "commit", "-q", "-m", "initial", date="2020-01-01T10:00:00")
+    
+    _git(path, "mv", "pkg/m.py", "pkg/renamed.py")
+    (path / "pkg" / "renamed.py").write_text("".join(f"x{i} = {i}\n" for i in range(11)))
+    _git(path, "add", "-A")
+    _git(path, "commit", "-q", "-m", "rename and edit", date="2020-02-01T10:00:00")
+    
+    _git(path, "checkout", "-q", "-b", "feat")
+    (path / "n.py").write_text("y = 2\n")
+    _git(path, "add", "-A")
+    _git(path, "commit", "-q", "-m", "add n", date="2020-03-01T10:00:00")
+    
+    _git(path, "checkout", "-q", "master")
+    (path / "a.py").write_text("print(1)\nprint(22)")
+    _git(path, "commit", "-q", "-am", "edit a", date="2020-04-01T10:00:00")
+    _git(path, "merge", "-q", "--no-ff", "-m", "merge feat", "feat", date="2020-05-01T10:00:00")
+    
+    return path
+
+
+def test_rename_with_edit():
+    hunks = split_hunks(RENAME_WITH_EDIT)
+    
+    assert len(hunks) == 1
+    assert hunks[0].file_path == "pkg/renamed.py"
+    assert (hunks[0].old_start, hunks[0].old_lines) == (1, 2)
+    assert (hunks[0].new_start, hunks[0].new_lines) == (1, 3)
+    assert hunks[0].added_lines == [(3, "z = 3")]
+    assert hunks[0].removed_lines == []
+
+
+def test_cached_hunks_cannot_be_modified():
+    hunk = split_hunks(RENAME_WITH_EDIT)[0]
+    
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        hunk.file_path = "elsewhere.py"
+    with pytest.raises(ValueError):
+        hunk.added_line_nos[0] = 99
+    assert split_hunks(RENAME_WITH_EDIT)[0].added_lines == [(3, "z = 3")]
+
+
+def test_no_newline_at_end_of_file():
+    hunks = split_hunks(NO_NEWLINE_AT_EOF)
+    
+    assert len(hunks) == 1
+    assert hunks[0].removed_lines == [(2, "print(2)\n")]
+    assert hunks[0].added_lines == [(2, "print(22)\n")]
+    assert hunks[0].content.count("\\ No newline at end of file") == 2
+
+
+def test_crlf_and_empty_context_lines():
+    hunks = split_hunks(CRLF_AND_EMPTY_CONTEXT)
+    
+    assert len(hunks) == 1
+    assert hunks[0].removed_lines == [(3, "b\r\n")]
+    assert hunks[0].added_lines == [(3, "c\r\n")]
+    # The bare newline is an empty context line, not the end of the hunk
+    assert hunks[0].content.splitlines(keepends=True)[1] == " \n"
+
+
+def test_body_lines_that_look_like_file_headers():
+    hunks = split_hunks(HEADER_LIKE_BODY_LINES)
+    
+    assert [h.file_path for h in hunks] == ["notes.md", "notes.md"]
+    assert hunks[0].removed_lines == [(2, "-- old rule\n")]
+    assert hunks[0].added_lines == [(2, "++ new rule\n")]
+    assert hunks[1].removed_lines == [(10, "-- x\n")]
+    assert hunks[1].added_lines == [(10, "++ y")]
+
+
+def test_root_commit_has_no_hunks(repo):
+    root = list_commits(str(repo))[-1]
+    diff = get_diff(str(repo), root)
+    
+    assert diff.parent_sha is None
+    assert diff.hunks == []
+    assert diff.raw_diff == ""
+
+
+def test_rename_commit(repo):
+    rename = list_commits(str(repo))[-2]
+    diff = get_diff(str(repo), rename)
+    
+    assert [h.file_path for h in diff.hunks] == ["pkg/renamed.py"]
+    assert diff.hunks[0].added_lines == [(11, "x10 = 10")]
+    # Totals count the rename as delete + add, like CommitInfo
+    assert diff.files_changed == ["pkg/m.py", "pkg/renamed.py"]
+    assert (diff.insertions, diff.deletions) == (11, 10)
+
+
+def test_diff_reuses_given_commit_info(repo):
+    rename = list_commits(str(repo))[-2]
+    info = get_commit_info(str(repo), rename)
+    diff = get_diff(str(repo), rename, commit_info=info)
+    
+    assert diff.files_changed == info.files_changed
+    assert (diff.insertions, diff.deletions) == (info.insertions, info.deletions)
+    assert diff.raw_diff == get_diff(str(repo), rename).raw_diff
+
+
+def test_cached_diff_honours_include_raw(repo, tmp_path, monkeypatch):
+    monkeypatch.setattr(git_ops, "CACHE_DIR", tmp_path / "cache")
+    sha = list_commits(str(repo))[-2]
+    
+    full = get_diff(str(repo), sha)
+    cached = get_diff(str(repo), sha, include_raw=False)
+    
+    assert full.raw_diff
+    assert cached.raw_diff == ""
+    assert get_diff(str(repo), sha).raw_diff == full.raw_diff
+
+
+def test_merge_commit_is_diffed_against_first_parent(repo):
+    merge = list_commits(str(repo))[0]
+    diff = get_diff(str(repo), merge)
+    
+    assert [h.file_path for h in diff.hunks] == ["n.py"]
+    assert diff.hunks[0].added_lines == [(1, "y = 2")]
+
+
+def _unidiff_hunks(diff_text):
+    """Reference parse with unidiff, in the shape split_hunks returns"""
+    import unidiff  # development dependency (requirements.txt)
+    
+    hunks = []
+    for patched_file in unidiff.PatchSet(diff_text):
+        for hunk in patched_file:
+            hunks.append((
+                patched_file.path,
+                hunk.source_start,
+                hunk.source_length,
+                hunk.target_start,
+                hunk.target_length,
+                "".join(str(line) for line in hunk),
+                [(l.target_line_no, l.value) for l in hunk if l.is_added],
+                [(l.source_line_no, l.value) for l in hunk if l.is_removed],
+            ))
+    return hunks
+
+
+def _hunk_tuples(hunks):
+    return [
+        (h.file_path, h.old_start, h.old_lines, h.new_start, h.new_lines,
+         h.content, h.added_lines, h.removed_lines)
+        for h in hunks
+    ]
+
+
+@pytest.mark.parametrize("diff_text", SAMPLE_DIFFS)
+def test_matches_unidiff_on_samples(diff_text):
+    assert _hunk_tuples(split_hunks(diff_text)) == _unidiff_hunks(diff_text)
+
+
+def test_matches_unidiff_on_repository(repo):
+    for sha in list_commits(str(repo)):
+        diff = get_diff(str(repo), sha)
+        assert _hunk_tuples(split_hunks(diff.raw_diff)) == _unidiff_hunks(diff.raw_diff)
+
+
+def _messages(repo, shas):
+    return [get_commit_info(str(repo), sha).message for sha in shas]
+
+
+def test_list_commits_order_and_limit(repo):
+    full = list_commits(str(repo))
+    
+    assert _messages(repo, full) == [
+        "merge feat", "edit a", "add n", "rename and edit", "initial"
+    ]
+    assert list_commits(str(repo), limit=2) == full[:2]
+    assert list_commits(str(repo), limit=0) == []
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"exclude_merges": True},
+    {"since": datetime(2020, 2, 1), "until": datetime(2020, 4, 15)},
+])
+def test_paged_commits_match_list_commits(repo, filters):
+    full = list_commits(str(repo), **filters)
+    
+    assert list(iter_commits_paged(str(repo), batch=1, max_limit=2, **filters)) == full
+    assert list(iter_commits_paged(str(repo), start=2, batch=1, **filters)) == full[2:]
+    assert list(iter_commits_paged(str(repo), start=len(full), **filters)) == []
+
+
+def test_paged_commits_stop_early(repo, monkeypatch):
+    calls = []
+    real_git = git_ops._git
+    
+    def counting_git(repo_path, *args, **kwargs):
+        calls.append(args[0])
+        return real_git(repo_path, *args, **kwargs)
+    
+    monkeypatch.setattr(git_ops, "_git", counting_git)
+    paged = iter_commits_paged(str(repo), batch=2)
+    
+    assert [next(paged), next(paged)] == list_commits(str(repo), limit=2)
+    # One page for the paged walk, one for list_commits
+    assert calls.count("rev-list") == 2
+
+
+def test_stop_at_drops_the_commit_and_its_ancestors(repo):
+    full = list_commits(str(repo))
+    rename = full[-2]
+    
+    remaining = list_commits(str(repo), stop_at=[rename])
+    
+    assert _messages(repo, remaining) == ["merge feat", "edit a", "add n"]
+    # Several exclusions go through stdin together
+    assert list_commits(str(repo), stop_at=[rename, full[2]]) == full[:2]
+    assert list_commits(str(repo), stop_at=[full[0]]) == []
+
+
+def test_blob_batcher_reads(repo):
+    rename = list_commits(str(repo))[-2]
+    
+    with BlobBatcher(str(repo)) as batcher:
+        assert batcher.get(rename, "pkg/renamed.py").endswith(b"x10 = 10\n")
+        assert batcher.get(rename, "pkg/m.py") is None
+        # Trees are not files
+        assert batcher.get(rename, "pkg") is None
+        assert batcher.get(rename, "a.py") == b"print(1)\nprint(2)\n"
+    
+    assert batcher.proc.poll() is not None
+
+
+def test_file_content_at_commit(repo):
+    tip, root = list_commits(str(repo))[0], list_commits(str(repo))[-1]
+    
+    assert get_file_content_at_commit(str(repo), tip, "a.py") == "print(1)\nprint(22)"
+    assert get_file_content_at_commit(str(repo), root, "a.py") == "print(1)\nprint(2)\n"
+    assert get_file_content_at_commit(str(repo), root, "n.py") is None
+    assert get_file_content_at_commit(str(repo), root, "pkg") is None
+
+
+def test_dead_blob_reader_is_replaced(repo):
+    tip = list_commits(str(repo))[0]
+    assert get_file_content_at_commit(str(repo), tip, "n.py") == "y = 2\n"
+    
+    reader = git_ops._open_batcher(str(repo))
+    reader.proc.kill()
+    reader.proc.wait()
+    
+    assert get_file_content_at_commit(str(repo), tip, "n.py") == "y = 2\n"
+    assert git_ops._open_batcher(str(repo)) is not reader
+    git_ops.close_blob_readers()
+
+
+def test_file_history_order_and_max_count(repo):
+    history = get_file_history(str(repo), "a.py")
+    
+    assert [c.message for c in history] == ["edit a", "initial"]
+    assert [c.files_changed for c in history] == [["a.py"], ["a.py", "pkg/m.py"]]
+    assert [c.sha for c in get_file_history(str(repo), "a.py", max_count=1)] == [history[0].sha]
+    assert get_file_history(str(repo), "missing.py") == []
+
+
+def test_file_history_simplifies_merges(repo):
+    # The merge brings n.py in unchanged from feat, so history simplification
+    # drops it and keeps only the commit that added the file
+    history = get_file_history(str(repo), "n.py")
+    
+    assert [c.message for c in history] == ["add n"]
+    assert [c.sha for c in get_file_history(str(repo), "pkg/renamed.py")] == [
+        list_commits(str(repo))[-2]
+    ]
+
+
+def test_queries_leave_the_repository_untouched(repo):
+    list_commits(str(repo))
+    list(iter_commits_paged(str(repo)))
+    get_file_history(str(repo), "a.py")
+    
+    # Writing the commit-graph is left to repository setup
+    assert not (repo / ".git" / "objects" / "info" / "commit-graph").exists()